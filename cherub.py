@@ -10,9 +10,39 @@ You approve. Shell gets smarter.
 Usage:
   cherub          → analyze last 20 exchanges
   cherub 40       → analyze last 40 exchanges
+  cherub --no-cache  → always re-ask the model
 """
-import os, sys, json, time
+import os, sys, json, time, hashlib, functools
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson                      # C-speed JSONL; stdlib json is the fallback
+    _loads, _dumps = orjson.loads, orjson.dumps
+except ImportError:
+    _loads = json.loads
+    _dumps = lambda obj: json.dumps(obj).encode()
+try:
+    from ry import parse_jsonl as _parse_jsonl      # whole file in one C call
+except ImportError:
+    _parse_jsonl = None
+try:
+    from jiter import from_json as _line_loads
+except ImportError:
+    _line_loads = _loads
+
+def parse_jsonl(data):
+    """Raw .jsonl bytes → list of entries. Bad or torn lines are skipped."""
+    if _parse_jsonl:
+        try: return list(_parse_jsonl(data))
+        except Exception: pass         # one bad line — redo it line by line
+    entries = []
+    for ln in data.splitlines():
+        if not ln: continue
+        try: entries.append(_line_loads(ln))
+        except Exception: pass
+    return entries
 
 # ── same defaults as sovereign ────────────────────────────────────────────────
 SERVER    = "https://axismundi.fun"
@@ -22,6 +52,8 @@ MODEL     = "axis-model"
 _cfg      = os.path.expanduser("~/.config/axis-mundi")
 LOG_FILE  = f"{_cfg}/log.jsonl"
 CMD_FILE  = f"{_cfg}/commands.json"
+CACHE_DIR = f"{_cfg}/cherub-cache"     # sha256(prompt) → model reply
+CACHE_TTL = 3600                       # seconds
 
 # ── ANSI ──────────────────────────────────────────────────────────────────────
 PINK = "\033[38;2;255;105;180m"
@@ -34,6 +66,7 @@ RST  = "\033[0m"
 BOLD = "\033[1m"
 
 # ── TOKEN ─────────────────────────────────────────────────────────────────────
+@functools.lru_cache(maxsize=1)
 def load_token():
     for src in [
         lambda: open(os.path.expanduser("~/.axis-token")).read().strip(),
@@ -47,23 +80,55 @@ def load_token():
             pass
     return ""
 
+# ── HTTP ──────────────────────────────────────────────────────────────────────
+# one keep-alive session — every retry rides the same TLS connection
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4,
+                                       max_retries=Retry(total=2, backoff_factor=0.2)))
+
+def _init_session(token):
+    _SESSION.headers["Content-Type"] = "application/json"
+    if token: _SESSION.headers["Authorization"] = f"Bearer {token}"
+
 # ── READ LOG ──────────────────────────────────────────────────────────────────
+def tail(path, n, block=65536):
+    """Last n lines of a file, reading backwards from the end in blocks."""
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        buf  = b""
+        while size > 0 and buf.count(b"\n") <= n:
+            step = min(block, size)
+            size -= step
+            f.seek(size)
+            buf = f.read(step) + buf
+    return buf.splitlines()[-n:]
+
 def read_log(n=20):
     if not os.path.exists(LOG_FILE):
         return []
-    lines = open(LOG_FILE).readlines()
-    entries = []
-    for ln in lines[-n:]:
-        try: entries.append(json.loads(ln.strip()))
-        except: pass
-    return entries
+    return parse_jsonl(b"\n".join(tail(LOG_FILE, n)))
+
+# ── REPLY CACHE ───────────────────────────────────────────────────────────────
+def _cache_get(key):
+    path = f"{CACHE_DIR}/{key}.json"
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_TTL:
+            return None
+        with open(path, "rb") as f:
+            return _loads(f.read())["content"]
+    except Exception:
+        return None
+
+def _cache_put(key, content):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = f"{CACHE_DIR}/{key}.json"
+    with open(path + ".tmp", "wb") as f:
+        f.write(_dumps({"content": content}))
+    os.replace(path + ".tmp", path)
 
 # ── ASK MODEL ────────────────────────────────────────────────────────────────
-def ask_model(exchanges, token):
-    convo = "\n".join(
-        f"USER: {e['user']}\nASSISTANT: {e['reply'][:200]}"
-        for e in exchanges
-    )
+def ask_model(exchanges, token, use_cache=True):
+    convo = "\n".join([f"USER: {e['user']}\nASSISTANT: {e['reply'][:200]}" for e in exchanges])
 
     prompt = (
         "Below are recent conversations from a sovereign terminal session.\n\n"
@@ -79,31 +144,50 @@ def ask_model(exchanges, token):
         "- Do not explain, just list"
     )
 
-    headers = {"Content-Type": "application/json"}
-    if token: headers["Authorization"] = f"Bearer {token}"
+    # unchanged log tail → same prompt → reuse the last answer
+    key = hashlib.sha256(f"{MODEL}\n{prompt}".encode()).hexdigest()
+    if use_cache:
+        content = _cache_get(key)
+        if content is not None:
+            print(f"  {GRAY}(cached — log tail unchanged){RST}")
+            return parse_suggestions(content)
 
     try:
-        r = requests.post(
+        with _SESSION.post(
             f"{MODEL_API}/chat/completions",
             json={
                 "model": MODEL,
                 "messages": [{"role": "user", "content": prompt}],
-                "stream": False,
+                "stream": True,
             },
-            headers=headers,
             timeout=120,
-        )
+            stream=True,
+        ) as r:
+            if not r.ok:
+                print(f"\n{RED}  model error {r.status_code}{RST}\n")
+                return []
+            content = "".join(_stream_content(r)).strip()
     except requests.exceptions.ConnectionError:
         print(f"\n{RED}  cannot reach {MODEL_API}{RST}\n")
         return []
-
-    if not r.ok:
-        print(f"\n{RED}  model error {r.status_code}{RST}\n")
+    except requests.exceptions.RequestException as e:   # stream broke mid-read — nothing to cache
+        print(f"\n{RED}  stream failed: {e}{RST}\n")
         return []
 
-    content = r.json()["choices"][0]["message"].get("content", "").strip()
+    if content:
+        _cache_put(key, content)
     return parse_suggestions(content)
 
+def _stream_content(r):
+    """Yield content deltas from an SSE chat-completions stream."""
+    for line in r.iter_lines():
+        if not line.startswith(b"data: "): continue
+        chunk = line[6:]
+        if chunk.strip() == b"[DONE]": break
+        try: tok = _loads(chunk)["choices"][0]["delta"].get("content") or ""
+        except: continue
+        if tok: yield tok
+
 # ── PARSE SUGGESTIONS ─────────────────────────────────────────────────────────
 def parse_suggestions(text):
     suggestions = []
@@ -148,21 +232,26 @@ def approve(suggestions, token):
             break
         elif ans == "y":
             cmds[name] = desc
-            os.makedirs(_cfg, exist_ok=True)
-            json.dump(cmds, open(CMD_FILE, "w"), indent=2)
-            print(f"  {LIME}✓ saved{RST}\n")
+            print(f"  {LIME}✓ added{RST}\n")
             added += 1
         else:
             print(f"  {GRAY}skipped{RST}\n")
 
     if added:
+        # one write for the whole session, swapped in atomically
+        os.makedirs(_cfg, exist_ok=True)
+        with open(CMD_FILE + ".tmp", "w") as f:
+            json.dump(cmds, f, indent=2)
+        os.replace(CMD_FILE + ".tmp", CMD_FILE)
         print(f"  {LIME}✓  {added} command(s) added — run sovereign and type / to see them{RST}\n")
     else:
         print(f"  {GRAY}nothing added{RST}\n")
 
 # ── MAIN ──────────────────────────────────────────────────────────────────────
 def main():
-    n = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 20
+    args = [a for a in sys.argv[1:] if a != "--no-cache"]
+    n = int(args[0]) if args and args[0].isdigit() else 20
+    use_cache = "--no-cache" not in sys.argv
 
     print(f"\n{PINK}{BOLD}  cherub{RST}  {GRAY}— sovereign pattern watcher{RST}\n")
 
@@ -170,6 +259,7 @@ def main():
     if not token:
         print(f"{RED}  no token — run bash ~/axismundi.fun first{RST}\n")
         sys.exit(1)
+    _init_session(token)
 
     exchanges = read_log(n)
     if not exchanges:
@@ -179,7 +269,7 @@ def main():
     print(f"  {GRAY}reading last {len(exchanges)} exchanges...{RST}")
     print(f"  {GRAY}asking model for patterns...{RST}\n")
 
-    suggestions = ask_model(exchanges, token)
+    suggestions = ask_model(exchanges, token, use_cache)
     approve(suggestions, token)
 
 if __name__ == "__main__":
@@ -14,8 +14,37 @@ Usage:
   python3 dance.py left
   python3 dance.py right
 """
-import os, sys, json, time, requests
+import os, sys, json, time, select, hashlib, textwrap, functools, requests
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson                      # C-speed JSONL; stdlib json is the fallback
+    _loads, _dumps = orjson.loads, orjson.dumps
+except ImportError:
+    _loads = json.loads
+    _dumps = lambda obj: json.dumps(obj).encode()
+try:
+    from ry import parse_jsonl as _parse_jsonl      # whole file in one C call
+except ImportError:
+    _parse_jsonl = None
+try:
+    from jiter import from_json as _line_loads
+except ImportError:
+    _line_loads = _loads
+
+def parse_jsonl(data):
+    """Raw .jsonl bytes → list of entries. Bad or torn lines are skipped."""
+    if _parse_jsonl:
+        try: return list(_parse_jsonl(data))
+        except Exception: pass         # one bad line — redo it line by line
+    entries = []
+    for ln in data.splitlines():
+        if not ln: continue
+        try: entries.append(_line_loads(ln))
+        except Exception: pass
+    return entries
 
 # ── SIDES ─────────────────────────────────────────────────────────────────────
 _ltoken = Path.home() / ".axis-token"
@@ -26,18 +55,23 @@ SIDES = {
         "name":  "CLAUDE",
         "api":   os.environ.get("LEFT_API",   "https://axismundi.fun/v1"),
         "model": os.environ.get("LEFT_MODEL", "axis-model"),
-        "token": _ltoken.read_text().strip() if _ltoken.exists() else os.environ.get("AXIS_TOKEN", ""),
+        "token_fn": lambda: _ltoken.read_text().strip() if _ltoken.exists() else os.environ.get("AXIS_TOKEN", ""),
         "color": "\033[38;2;0;220;255m",   # CYAN
     },
     "right": {
         "name":  "ARCEE",
         "api":   os.environ.get("RIGHT_API",   "https://models.arcee.ai/v1"),
         "model": os.environ.get("RIGHT_MODEL", "auto"),
-        "token": _rtoken.read_text().strip() if _rtoken.exists() else os.environ.get("ARCEE_TOKEN", ""),
+        "token_fn": lambda: _rtoken.read_text().strip() if _rtoken.exists() else os.environ.get("ARCEE_TOKEN", ""),
         "color": "\033[38;2;255;105;180m",  # PINK
     },
 }
 
+@functools.lru_cache(maxsize=None)
+def token(side_key):
+    """Read a side's token on first use only — the idle side never touches disk."""
+    return SIDES[side_key]["token_fn"]()
+
 # ── THE DANCE ─────────────────────────────────────────────────────────────────
 STEPS = [
     ("WAKE",    "left",
@@ -72,6 +106,9 @@ STEPS = [
 # ── PATHS ─────────────────────────────────────────────────────────────────────
 _cfg       = Path.home() / ".config" / "axis-mundi"
 DANCE_FILE = _cfg / "dance.jsonl"
+CACHE_DIR  = _cfg / "dance-cache"     # prefix-hash → response, OpenAI-compat sides
+USE_CACHE  = os.environ.get("DANCE_CACHE", "0") != "0"   # opt-in: the WAKE opening never changes,
+                                                          # so a cached run replays the same dance
 
 # ── ANSI ──────────────────────────────────────────────────────────────────────
 LIME = "\033[38;2;57;255;100m"
@@ -82,69 +119,185 @@ BOLD = "\033[1m"
 DIM  = "\033[2m"
 
 # ── FILE BUS ──────────────────────────────────────────────────────────────────
-def read_dance():
-    if not DANCE_FILE.exists():
-        return []
-    entries = []
-    for ln in DANCE_FILE.read_text().splitlines():
-        try: entries.append(json.loads(ln))
-        except: pass
-    return entries
-
 def write_step(side, step_name, content):
     _cfg.mkdir(parents=True, exist_ok=True)
-    with open(DANCE_FILE, "a") as f:
-        f.write(json.dumps({
+    with open(DANCE_FILE, "ab") as f:
+        f.write(_dumps({
             "ts": int(time.time()),
             "from": side,
             "step": step_name,
             "content": content,
-        }) + "\n")
+        }) + b"\n")
+
+# tail state — each line of the bus is parsed and formatted exactly once
+_pos     = 0                          # bytes of DANCE_FILE already consumed
+_by_step = {}                         # step name → entry
+_prefix  = {"left": [], "right": []}  # per side: history as ready-made chat messages
+
+def _add(entry):
+    if entry["step"] in _by_step:
+        return
+    _by_step[entry["step"]] = entry
+    content = f"[{entry['step']} — {SIDES[entry['from']]['name']}]\n{entry['content']}"
+    for side, msgs in _prefix.items():
+        msgs.append({"role": "assistant" if entry["from"] == side else "user",
+                     "content": content})
+
+def _refresh():
+    global _pos
+    try:
+        with open(DANCE_FILE, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _pos:   # left started a fresh dance
+                _pos = 0
+                _by_step.clear()
+                for msgs in _prefix.values(): msgs.clear()
+            f.seek(_pos)
+            data = f.read()
+    except FileNotFoundError:
+        return
+    end = data.rfind(b"\n") + 1    # leave a half-written line for next time
+    for entry in parse_jsonl(data[:end]):
+        _add(entry)
+    _pos += end
 
 def step_exists(step_name):
-    return any(e["step"] == step_name for e in read_dance())
+    _refresh()
+    return step_name in _by_step
 
 def get_step(step_name):
-    for e in read_dance():
-        if e["step"] == step_name:
-            return e
-    return None
+    _refresh()
+    return _by_step.get(step_name)
+
+# ── WAKEUPS ───────────────────────────────────────────────────────────────────
+# inotify on the config dir wakes us the moment the partner writes;
+# plain 300 ms polling stays as the fallback (non-Linux, no libc, NFS...)
+IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_TO, IN_CREATE = 0x2, 0x8, 0x80, 0x100
+_ifd = False       # False = not tried yet, None = unavailable
+
+def _inotify():
+    try:
+        import ctypes, ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0: return None
+        _cfg.mkdir(parents=True, exist_ok=True)
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(fd, os.fsencode(_cfg), mask) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except Exception:
+        return None
+
+def wait_for_bus(timeout=0.3):
+    """Block until the dance file changes, or timeout seconds pass."""
+    global _ifd
+    if _ifd is False:
+        _ifd = _inotify()
+    if _ifd is None:
+        time.sleep(timeout)
+        return
+    if select.select([_ifd], [], [], timeout)[0]:
+        try:
+            while os.read(_ifd, 4096): pass
+        except BlockingIOError:
+            pass
 
 # ── API ───────────────────────────────────────────────────────────────────────
-def call_api(side_key, step_prompt):
+SYSTEM = {"role": "system", "content": (
+    "You are in The Dance — a structured 6-step exchange between two AI systems "
+    "in adjacent terminal panes. Respond with substance. No filler. No meta-commentary."
+)}
+
+# one keep-alive session per side — all of our steps reuse the same connection
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4,
+                                       max_retries=Retry(total=2, backoff_factor=0.2)))
+
+def _is_anthropic(s):
+    return "api.anthropic.com" in s["api"]
+
+def _init_session(side_key):
+    s   = SIDES[side_key]
+    tok = token(side_key)
+    _SESSION.headers["Content-Type"] = "application/json"
+    if _is_anthropic(s):
+        _SESSION.headers["anthropic-version"] = "2023-06-01"
+        if tok: _SESSION.headers["x-api-key"] = tok
+    elif tok:
+        _SESSION.headers["Authorization"] = f"Bearer {tok}"
+
+def _anthropic_payload(s, messages):
+    """Messages-API shape with a cache breakpoint on the stable history prefix."""
+    msgs = [dict(m) for m in messages[1:]]
+    if msgs[0]["role"] != "user":           # the API wants a user turn first
+        msgs.insert(0, {"role": "user", "content": "[the dance begins]"})
+    if len(msgs) > 1:                        # everything before this step's prompt
+        prev = msgs[-2]
+        prev["content"] = [{"type": "text", "text": prev["content"],
+                            "cache_control": {"type": "ephemeral"}}]
+    return {"model": s["model"], "max_tokens": 1024, "system": messages[0]["content"],
+            "messages": msgs, "stream": True}
+
+def _cache_path(s, messages):
+    key = json.dumps({"api": s["api"], "model": s["model"], "messages": messages},
+                     sort_keys=True, ensure_ascii=False)
+    return CACHE_DIR / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+def _cache_put(path, content):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(_dumps({"content": content}))
+    os.replace(tmp, path)
+
+def call_api(side_key, step_prompt, on_token=None):
     s = SIDES[side_key]
-    history = read_dance()
-
-    # build context from all previous steps
-    system = (
-        "You are in The Dance — a structured 6-step exchange between two AI systems "
-        "in adjacent terminal panes. Respond with substance. No filler. No meta-commentary."
-    )
-    messages = [{"role": "system", "content": system}]
-    for entry in history:
-        name = SIDES[entry["from"]]["name"]
-        messages.append({
-            "role": "user" if entry["from"] != side_key else "assistant",
-            "content": f"[{entry['step']} — {name}]\n{entry['content']}",
-        })
-    messages.append({"role": "user", "content": step_prompt})
-
-    headers = {"Content-Type": "application/json"}
-    if s["token"]:
-        headers["Authorization"] = f"Bearer {s['token']}"
+
+    # context = all previous steps, already formatted by the tail reader
+    _refresh()
+    messages = [SYSTEM, *_prefix[side_key], {"role": "user", "content": step_prompt}]
+
+    if _is_anthropic(s):
+        url, payload, cached = f"{s['api']}/messages", _anthropic_payload(s, messages), None
+    else:
+        url     = f"{s['api']}/chat/completions"
+        payload = {"model": s["model"], "messages": messages, "stream": True}
+        cached  = _cache_path(s, messages) if USE_CACHE else None
+        if cached and cached.exists():
+            try: return _loads(cached.read_bytes())["content"]
+            except: pass
 
     try:
-        r = requests.post(
-            f"{s['api']}/chat/completions",
-            json={"model": s["model"], "messages": messages, "stream": False},
-            headers=headers,
-            timeout=120,
-        )
-        if r.ok:
-            return r.json()["choices"][0]["message"]["content"].strip()
-        return f"[API error {r.status_code}: {r.text[:120]}]"
+        with _SESSION.post(url, json=payload, timeout=120, stream=True) as r:
+            if not r.ok:
+                return f"[API error {r.status_code}: {r.text[:120]}]"
+            parts = []
+            for tok in _stream_content(r):
+                parts.append(tok)
+                if on_token: on_token(tok)
+            content = "".join(parts).strip()
     except Exception as e:
         return f"[connection error: {e}]"
+    if cached and content:
+        _cache_put(cached, content)
+    return content
+
+def _stream_content(r):
+    """Yield text deltas from an SSE stream — OpenAI chat or Anthropic messages."""
+    for line in r.iter_lines():
+        if not line.startswith(b"data: "): continue
+        chunk = line[6:]
+        if chunk.strip() == b"[DONE]": break
+        try:
+            ev = _loads(chunk)
+            if "choices" in ev:
+                tok = ev["choices"][0]["delta"].get("content") or ""
+            elif ev.get("type") == "content_block_delta":
+                tok = ev["delta"].get("text", "")
+            else:
+                continue
+        except: continue
+        if tok: yield tok
 
 # ── DISPLAY ───────────────────────────────────────────────────────────────────
 def show(entry, my_side):
@@ -154,21 +307,50 @@ def show(entry, my_side):
     arrow = "▶" if mine else "◀"
     print(f"\n{color}{BOLD}{arrow} {s['name']}  [{entry['step']}]{RST}")
     # word-wrap at ~72 chars
-    words, line = entry["content"].split(), ""
-    for w in words:
-        if len(line) + len(w) + 1 > 72:
-            print(f"  {color}{line}{RST}")
-            line = w
-        else:
-            line = (line + " " + w).strip()
-    if line:
+    wrapped = textwrap.fill(entry["content"], width=72,
+                            break_long_words=False, break_on_hyphens=False)
+    for line in wrapped.splitlines():
         print(f"  {color}{line}{RST}")
 
+class Live:
+    """Shows one of our own steps as it streams in — same look and wrap as show()."""
+    def __init__(self, side, step_name, width=72):
+        self.s, self.step, self.width = SIDES[side], step_name, width
+        self.buf, self.col, self.started = "", 0, False
+
+    def _start(self):
+        color = self.s["color"]
+        sys.stdout.write("\r" + " " * 50 + "\r")
+        sys.stdout.write(f"\n{color}{BOLD}▶ {self.s['name']}  [{self.step}]{RST}\n  {color}")
+        self.started = True
+
+    def _word(self, w):
+        if self.col and self.col + len(w) + 1 > self.width:
+            sys.stdout.write(f"{RST}\n  {self.s['color']}")
+            self.col = 0
+        sys.stdout.write(f" {w}" if self.col else w)
+        self.col += len(w) + (1 if self.col else 0)
+
+    def feed(self, tok):
+        if not self.started: self._start()
+        self.buf += tok
+        words = self.buf.split()
+        # hold back a trailing partial word until its whitespace arrives
+        self.buf = words.pop() if words and not self.buf[-1].isspace() else ""
+        for w in words: self._word(w)
+        sys.stdout.flush()
+
+    def close(self):
+        for w in self.buf.split(): self._word(w)
+        sys.stdout.write(f"{RST}\n")
+        sys.stdout.flush()
+
 # ── MAIN ──────────────────────────────────────────────────────────────────────
 def run(side):
     s     = SIDES[side]
     color = s["color"]
     other = "right" if side == "left" else "left"
+    _init_session(side)
 
     print(f"\n{color}{BOLD}  dance  ·  {s['name']}{RST}  {GRAY}via {s['api']}{RST}")
     print(f"  {GRAY}6-step sovereign handshake  ·  awaiting partner...{RST}\n")
@@ -179,7 +361,7 @@ def run(side):
         DANCE_FILE.write_text("")   # fresh dance
     else:
         while not DANCE_FILE.exists() or DANCE_FILE.stat().st_size == 0:
-            time.sleep(0.3)
+            wait_for_bus()
         print(f"  {LIME}left is live — entering dance{RST}\n")
 
     for step_name, sender, prompt in STEPS:
@@ -187,17 +369,21 @@ def run(side):
             # ── MY TURN ──────────────────────────────────────────────────
             sys.stdout.write(f"  {color}[{step_name}]{RST}  {GRAY}thinking...{RST}  ")
             sys.stdout.flush()
-            response = call_api(side, prompt)
-            sys.stdout.write("\r" + " " * 50 + "\r")
+            live = Live(side, step_name)
+            response = call_api(side, prompt, on_token=live.feed)
             write_step(side, step_name, response)
-            show({"from": side, "step": step_name, "content": response}, side)
+            if live.started:
+                live.close()
+            else:
+                sys.stdout.write("\r" + " " * 50 + "\r")
+                show({"from": side, "step": step_name, "content": response}, side)
 
         else:
             # ── THEIR TURN — WAIT ─────────────────────────────────────────
             sys.stdout.write(f"\n  {GRAY}[{step_name}]  waiting for {SIDES[other]['name']}...{RST}")
             sys.stdout.flush()
             while not step_exists(step_name):
-                time.sleep(0.3)
+                wait_for_bus()
             sys.stdout.write("\r" + " " * 55 + "\r")
             entry = get_step(step_name)
             if entry:
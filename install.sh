@@ -98,6 +98,16 @@ if ! "$PYTHON" -c "import requests" &>/dev/null 2>&1; then
 fi
 echo -e "  ${LIME}✓${RST}  requests"
 
+# ── ORJSON (optional — faster registry/log JSON, falls back to stdlib) ────────
+"$PYTHON" -c "import orjson" &>/dev/null 2>&1 \
+    || "$PYTHON" -m pip install --quiet --user orjson &>/dev/null 2>&1 \
+    || true
+
+# ── RAPIDFUZZ (optional — C scorer for "did you mean", falls back to difflib) ─
+"$PYTHON" -c "import rapidfuzz" &>/dev/null 2>&1 \
+    || "$PYTHON" -m pip install --quiet --user rapidfuzz &>/dev/null 2>&1 \
+    || true
+
 # ── CURL / WGET ───────────────────────────────────────────────────────────────
 DL=""
 command -v curl  &>/dev/null && DL="curl -fsSL"
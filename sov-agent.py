@@ -12,15 +12,29 @@ Usage:
   sov-agent --watch          # continuous observe mode, no actions
   sov-agent --loop "task"    # keep going until task is done
 """
-import os, sys, json, time, base64, subprocess, argparse, requests
+import os, sys, io, re, json, time, base64, functools, threading, subprocess, argparse, requests
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson                      # C-speed parsing; stdlib json is the fallback
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
 # ── CONFIG ─────────────────────────────────────────────────────────────────
 VISION_API   = os.environ.get("VISION_API",  "https://api.anthropic.com/v1/messages")
 VISION_MODEL = os.environ.get("VISION_MODEL", "claude-haiku-4-5-20251001")
 DISPLAY      = os.environ.get("DISPLAY", ":0")
 MAX_STEPS    = int(os.environ.get("SOV_AGENT_STEPS", "10"))
+_ENV         = {**os.environ, "DISPLAY": DISPLAY}   # built once for every subprocess
+MAX_EDGE     = 1280          # px — longest edge sent to the vision model
+SAME_SCREEN  = 4             # dHash bits — fewer differing bits = unchanged screen
+RESEE_EVERY  = 5             # watch loop: real vision call at least every N frames
 
+@functools.lru_cache(maxsize=1)
 def load_token():
     for src in [
         lambda: Path.home().joinpath(".anthropic-token").read_text().strip(),
@@ -32,6 +46,19 @@ def load_token():
         except: pass
     return ""
 
+# ── HTTP ───────────────────────────────────────────────────────────────────
+# one keep-alive session — every step of the loop reuses the same TLS connection
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4,
+                                       max_retries=Retry(total=2, backoff_factor=0.2)))
+
+def _init_session(token):
+    _SESSION.headers.update({
+        "x-api-key": token,
+        "anthropic-version": "2023-06-01",
+        "content-type": "application/json",
+    })
+
 # ── ANSI ───────────────────────────────────────────────────────────────────
 PINK = "\033[38;2;255;105;180m"; LIME = "\033[38;2;57;255;100m"
 CYAN = "\033[38;2;0;220;255m";   GOLD = "\033[38;2;255;200;50m"
@@ -40,16 +67,56 @@ RST  = "\033[0m"; BOLD = "\033[1m"
 
 # ── EYES — grab screen ─────────────────────────────────────────────────────
 def grab(path="/tmp/sov-agent.png"):
-    env = {**os.environ, "DISPLAY": DISPLAY}
-    subprocess.run(["scrot", "-o", path], env=env,
-                   capture_output=True, timeout=5)
-    return path
-
-def encode(path):
-    return base64.standard_b64encode(Path(path).read_bytes()).decode()
+    """
+    Screen → (image bytes, media type, scale back to screen pixels, dhash).
+    In-process mss + Pillow, scrot as fallback. Frames wider than MAX_EDGE
+    are shrunk before upload — the vision model would downscale them anyway.
+    """
+    try:
+        import mss
+        from PIL import Image
+        with mss.mss(display=DISPLAY) as sct:
+            raw = sct.grab(sct.monitors[0])
+        img = Image.frombytes("RGB", raw.size, raw.rgb)
+    except ImportError:
+        subprocess.run(["scrot", "-o", path], env=_ENV, timeout=5,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            from PIL import Image
+            img = Image.open(path)
+        except ImportError:
+            return Path(path).read_bytes(), "image/png", 1.0, None
+        if max(img.size) <= MAX_EDGE:        # already small — send as-is
+            return Path(path).read_bytes(), "image/png", 1.0, dhash(img)
+
+    w = img.size[0]
+    if max(img.size) > MAX_EDGE:
+        img.thumbnail((MAX_EDGE, MAX_EDGE), Image.BILINEAR)
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=85)
+    return buf.getvalue(), "image/jpeg", w / img.size[0], dhash(img)
+
+def dhash(img):
+    """64-bit difference hash — near-identical frames differ in only a few bits."""
+    px = list(img.convert("L").resize((9, 8)).getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            i = row * 9 + col
+            bits = (bits << 1) | (px[i] > px[i + 1])
+    return bits
+
+def encode(data):
+    return base64.b64encode(memoryview(data)).decode()
+
+def snap(settle=0):
+    """grab + encode, after letting the screen settle — runs on the worker pool."""
+    if settle: time.sleep(settle)
+    data, media_type, scale, phash = grab()
+    return encode(data), media_type, scale, phash
 
 # ── BRAIN — ask vision model what it sees + what to do ────────────────────
-def see_and_decide(image_path, task, history, token, observe_only=False):
+def see_and_decide(image, task, history, token, observe_only=False):
     action_schema = "" if observe_only else """
 After describing the screen, respond with a JSON action block:
 ```json
@@ -88,8 +155,8 @@ Current task: {task}
             "type": "image",
             "source": {
                 "type": "base64",
-                "media_type": "image/png",
-                "data": encode(image_path),
+                "media_type": image[1],
+                "data": image[0],
             },
         },
         {
@@ -99,72 +166,163 @@ Current task: {task}
         },
     ]
 
-    headers = {
-        "x-api-key": token,
-        "anthropic-version": "2023-06-01",
-        "content-type": "application/json",
-    }
-
     payload = {
         "model": VISION_MODEL,
         "max_tokens": 1024,
         "system": system,
         "messages": history_msgs + [{"role": "user", "content": content}],
+        "stream": True,
     }
 
-    r = requests.post(VISION_API, json=payload, headers=headers, timeout=60)
-    if not r.ok:
-        return None, f"vision error {r.status_code}: {r.text[:200]}"
-    return r.json()["content"][0]["text"].strip(), None
+    text = ""
+    r = _SESSION.post(VISION_API, json=payload, timeout=60, stream=True)
+    try:
+        if not r.ok:
+            return None, f"vision error {r.status_code}: {r.text[:200]}"
+        lines = r.iter_lines()
+        for line in lines:
+            if not line.startswith(b"data: "): continue
+            try: ev = _loads(line[6:])
+            except: continue
+            if ev.get("type") == "error":
+                return None, f"vision error: {ev['error'].get('message', ev['error'])}"
+            if ev.get("type") != "content_block_delta": continue
+            tok = ev["delta"].get("text", "")
+            text += tok
+            # stop as soon as the ```json action block closes — execute sooner,
+            # and let the tail of the stream drain off-thread so the socket goes
+            # back to the pool instead of being closed (next step reuses it)
+            if not observe_only and "`" in tok and _fence_closed(text) and parse_action(text):
+                threading.Thread(target=_drain, args=(r, lines), daemon=True).start()
+                r = None
+                break
+    finally:
+        if r is not None: r.close()
+    return text.strip(), None
+
+def _drain(r, lines):
+    # keep pulling the same iterator — abandoning it mid-chunk makes urllib3
+    # close the socket; read to the end and close() just releases it
+    try:
+        for _ in lines: pass
+    except: pass
+    r.close()
+
+def _fence_closed(text):
+    i = text.find("```json")
+    return i != -1 and text.find("```", i + 7) != -1
 
 # ── HANDS — execute action ─────────────────────────────────────────────────
+_JSON_FENCE  = re.compile(r'```json\s*', re.ASCII)
+_JSON_TOKENS = re.compile(r'[{}"\\]')
+_BARE_ACTION = re.compile(r'\{[^{}]*"action"[^{}]*\}')
+
+def _match_brace(text, start):
+    """End index just past the object opening at text[start], or -1 if unclosed."""
+    depth, in_str, skip = 0, False, -1
+    for m in _JSON_TOKENS.finditer(text, start):
+        i = m.start()
+        if i == skip: continue
+        c = text[i]
+        if c == "\\":
+            skip = i + 1                  # escaped char — only matters inside strings
+        elif c == '"':
+            in_str = not in_str
+        elif in_str:
+            continue
+        elif c == "{":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0: return i + 1
+    return -1
+
 def parse_action(response):
     """Extract JSON action block from model response."""
-    import re
-    m = re.search(r'```json\s*(\{.*?\})\s*```', response, re.DOTALL)
-    if m:
-        try: return json.loads(m.group(1))
-        except: pass
+    m = _JSON_FENCE.search(response)
+    if m and response.startswith("{", m.end()):
+        end = _match_brace(response, m.end())
+        if end != -1:
+            try: return _loads(response[m.end():end])
+            except: pass
     # try bare JSON
-    m = re.search(r'\{[^{}]*"action"[^{}]*\}', response, re.DOTALL)
+    m = _BARE_ACTION.search(response)
     if m:
-        try: return json.loads(m.group(0))
+        try: return _loads(m.group(0))
         except: pass
     return None
 
+def to_screen(action, scale):
+    """Map x/y from the (possibly shrunk) frame the model saw back to screen pixels."""
+    if scale != 1.0:
+        for k in ("x", "y"):
+            try: action[k] = round(float(action[k]) * scale)
+            except (KeyError, TypeError, ValueError): pass
+    return action
+
+# in-process pointer events over XTEST (python-xlib); xdotool is the fallback
+_XD = False          # False = not tried yet, None = unavailable
+
+def _xdisplay():
+    global _XD
+    if _XD is False:
+        try:
+            from Xlib import display
+            _XD = display.Display(DISPLAY)
+            if not _XD.has_extension("XTEST"): _XD = None
+        except Exception:
+            _XD = None
+    return _XD
+
+def _xclick(button, x=None, y=None, times=1):
+    """Move (optional) + click via XTEST. False when XTEST isn't available."""
+    d = _xdisplay()
+    if d is None: return False
+    from Xlib import X
+    from Xlib.ext import xtest
+    if x is not None:
+        xtest.fake_input(d, X.MotionNotify, x=int(x), y=int(y))
+    for _ in range(times):
+        xtest.fake_input(d, X.ButtonPress, button)
+        xtest.fake_input(d, X.ButtonRelease, button)
+    d.sync()
+    return True
+
 def execute(action):
-    env = {**os.environ, "DISPLAY": DISPLAY}
     act = action.get("action", "")
 
     if act == "click":
         x, y = action.get("x", 0), action.get("y", 0)
-        subprocess.run(["xdotool", "mousemove", str(x), str(y), "click", "1"],
-                       env=env, capture_output=True)
+        if not _xclick(1, x, y):
+            subprocess.run(["xdotool", "mousemove", str(x), str(y), "click", "1"],
+                           env=_ENV, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         return f"clicked ({x},{y})"
 
     elif act == "type":
         text = action.get("text", "")
         subprocess.run(["xdotool", "type", "--clearmodifiers", "--delay", "20", "--", text],
-                       env=env, capture_output=True)
+                       env=_ENV, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         return f"typed: {text[:40]}"
 
     elif act == "key":
         key = action.get("key", "")
-        subprocess.run(["xdotool", "key", key], env=env, capture_output=True)
+        subprocess.run(["xdotool", "key", key],
+                       env=_ENV, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         return f"pressed: {key}"
 
     elif act == "scroll":
         x, y = action.get("x", 500), action.get("y", 400)
         btn = "4" if action.get("direction") == "up" else "5"
-        for _ in range(3):
-            subprocess.run(["xdotool", "click", "--", btn], env=env, capture_output=True)
+        if not _xclick(int(btn), times=3):
+            subprocess.run(["xdotool", "click", "--repeat", "3", "--", btn],
+                           env=_ENV, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         return f"scrolled {action.get('direction','down')} at ({x},{y})"
 
     elif act == "shell":
         cmd = action.get("command", "")
         try:
             r = subprocess.run(cmd, shell=True, capture_output=True,
-                               text=True, timeout=15, env=env)
+                               text=True, timeout=15, env=_ENV)
             out = (r.stdout + r.stderr)[:300]
             return f"shell: {cmd}\n→ {out}"
         except Exception as e:
@@ -185,6 +343,7 @@ def run(task, observe_only=False, loop_mode=False):
     if not token:
         print(f"\n  {RED}no anthropic token — set ~/.anthropic-token{RST}\n")
         sys.exit(1)
+    _init_session(token)
 
     print(f"\n{PINK}{BOLD}  sov-agent{RST}  {GRAY}sovereign computer use{RST}")
     if observe_only:
@@ -194,57 +353,79 @@ def run(task, observe_only=False, loop_mode=False):
 
     history = []
     steps   = 0
-
-    while steps < MAX_STEPS:
-        steps += 1
-        print(f"  {CYAN}[step {steps}]{RST}  {GRAY}grabbing screen...{RST}", flush=True)
-
-        img = grab()
-        print(f"  {CYAN}[step {steps}]{RST}  {GRAY}thinking...{RST}", flush=True)
-
-        response, err = see_and_decide(img, task, history, token, observe_only)
-        if err:
-            print(f"  {RED}✗  {err}{RST}")
-            break
-
-        # print what the model sees
-        print(f"\n  {LIME}◉ sees:{RST}")
-        for line in response.split("\n")[:8]:
-            print(f"    {GRAY}{line}{RST}")
-
-        if observe_only:
-            history.append({"role": "assistant", "content": response})
-            history.append({"role": "user",      "content": "continue observing"})
-            print()
-            if not loop_mode: break
-            time.sleep(3)
-            continue
-
-        # parse and execute action
-        action = parse_action(response)
-        if action:
-            reason = action.get("reason", "")
-            print(f"\n  {GOLD}⚙  {action.get('action','?')}{RST}  {GRAY}{reason}{RST}")
-            result = execute(action)
-            print(f"  {LIME}↩  {result}{RST}\n")
-
-            history.append({"role": "assistant", "content": response})
-            history.append({"role": "user",      "content": f"action result: {result}"})
-
-            if action.get("action") == "done" or result.startswith("DONE"):
-                print(f"{LIME}{BOLD}  ✦  task complete{RST}\n")
+    seen    = None       # dhash of the frame behind the last real vision call
+    reused  = 0
+
+    # the next frame is grabbed + encoded off the main thread: in watch mode
+    # it overlaps the vision call, in action mode it starts right after execute
+    pool = ThreadPoolExecutor(max_workers=2)
+    nxt  = pool.submit(snap)
+    try:
+        while steps < MAX_STEPS:
+            steps += 1
+            print(f"  {CYAN}[step {steps}]{RST}  {GRAY}grabbing screen...{RST}", flush=True)
+
+            img = nxt.result()
+            if observe_only and loop_mode:
+                nxt = pool.submit(snap, 3)
+
+            # watch loop on a still screen: skip the vision call, keep the last look
+            if (observe_only and loop_mode and seen is not None and img[3] is not None
+                    and bin(seen ^ img[3]).count("1") < SAME_SCREEN
+                    and reused < RESEE_EVERY - 1):
+                reused += 1
+                print(f"  {CYAN}[step {steps}]{RST}  {GRAY}screen unchanged — skipping{RST}\n", flush=True)
+                continue
+
+            print(f"  {CYAN}[step {steps}]{RST}  {GRAY}thinking...{RST}", flush=True)
+
+            response, err = see_and_decide(img, task, history, token, observe_only)
+            if err:
+                print(f"  {RED}✗  {err}{RST}")
                 break
-
-            time.sleep(1)  # let screen update
-        else:
-            print(f"  {GRAY}(no action parsed — observing){RST}\n")
-            history.append({"role": "assistant", "content": response})
-            if not loop_mode: break
+            seen, reused = img[3], 0
+
+            # print what the model sees
+            print(f"\n  {LIME}◉ sees:{RST}")
+            for line in response.split("\n")[:8]:
+                print(f"    {GRAY}{line}{RST}")
+
+            if observe_only:
+                history.append({"role": "assistant", "content": response})
+                history.append({"role": "user",      "content": "continue observing"})
+                print()
+                if not loop_mode: break
+                continue
+
+            # parse and execute action
+            action = parse_action(response)
+            if action:
+                reason = action.get("reason", "")
+                print(f"\n  {GOLD}⚙  {action.get('action','?')}{RST}  {GRAY}{reason}{RST}")
+                result = execute(to_screen(action, img[2]))
+                print(f"  {LIME}↩  {result}{RST}\n")
+
+                history.append({"role": "assistant", "content": response})
+                history.append({"role": "user",      "content": f"action result: {result}"})
+
+                if action.get("action") == "done" or result.startswith("DONE"):
+                    print(f"{LIME}{BOLD}  ✦  task complete{RST}\n")
+                    break
+
+                nxt = pool.submit(snap, 1)  # let screen update
+            else:
+                print(f"  {GRAY}(no action parsed — observing){RST}\n")
+                history.append({"role": "assistant", "content": response})
+                if not loop_mode: break
+                nxt = pool.submit(snap)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
 
     if steps >= MAX_STEPS:
         print(f"  {GRAY}max steps ({MAX_STEPS}) reached{RST}\n")
 
 def main():
+    global MAX_STEPS
     parser = argparse.ArgumentParser(description="sov-agent — sovereign computer use")
     parser.add_argument("task", nargs="?", default="", help="task to perform")
     parser.add_argument("--watch",  action="store_true", help="observe only, no actions")
@@ -252,7 +433,6 @@ def main():
     parser.add_argument("--steps",  type=int, default=MAX_STEPS)
     args = parser.parse_args()
 
-    global MAX_STEPS
     MAX_STEPS = args.steps
 
     if not args.task and not args.watch:
@@ -16,6 +16,7 @@ from pathlib import Path
 
 OUT   = "/tmp/sov-eye.png"
 CROP  = "/tmp/sov-eye-crop.png"
+_ENV  = {**os.environ, "DISPLAY": os.environ.get("DISPLAY", ":0")}   # built once
 
 PINK = "\033[38;2;255;105;180m"
 LIME = "\033[38;2;57;255;100m"
@@ -26,34 +27,44 @@ BOLD = "\033[1m"
 
 def grab(path=OUT, select=False):
     """Take a screenshot. select=True for click-drag region."""
-    env = {**os.environ, "DISPLAY": os.environ.get("DISPLAY", ":0")}
     if select:
         # scrot -s = click-drag to select region
-        r = subprocess.run(["scrot", "-s", path], env=env)
-    else:
-        r = subprocess.run(["scrot", path], env=env)
-    return r.returncode == 0
+        r = subprocess.run(["scrot", "-s", path], env=_ENV)
+        return r.returncode == 0
+    try:
+        # in-process capture — no fork, fast zlib level
+        import mss
+        from PIL import Image
+        with mss.mss(display=_ENV["DISPLAY"]) as sct:
+            raw = sct.grab(sct.monitors[0])
+        Image.frombytes("RGB", raw.size, raw.rgb).save(
+            path, format="PNG", optimize=False, compress_level=1)
+        return True
+    except Exception:
+        # no mss/Pillow, or mss couldn't talk to the display — scrot as before
+        try:
+            r = subprocess.run(["scrot", path], env=_ENV)
+        except FileNotFoundError:
+            return False
+        return r.returncode == 0
 
 def show_feh(path):
-    env = {**os.environ, "DISPLAY": os.environ.get("DISPLAY", ":0")}
     subprocess.Popen(
         ["feh", "--geometry", "960x600+100+100", "--title", "sov-eye", path],
-        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        env=_ENV, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
     )
 
 def show_eog(path):
-    env = {**os.environ, "DISPLAY": os.environ.get("DISPLAY", ":0")}
     subprocess.Popen(
         ["eog", path],
-        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        env=_ENV, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
     )
 
 def show_display(path):
     """ImageMagick display as fallback."""
-    env = {**os.environ, "DISPLAY": os.environ.get("DISPLAY", ":0")}
     subprocess.Popen(
         ["display", "-title", "sov-eye", "-resize", "960x600>", path],
-        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        env=_ENV, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
     )
 
 def show_tkinter(path):
@@ -67,11 +78,7 @@ def show_tkinter(path):
     root.attributes("-topmost", True)
     root.attributes("-alpha", 0.95)
 
-    img  = Image.open(path)
-    # scale to fit ~960 wide
-    w, h = img.size
-    scale = min(960 / w, 600 / h)
-    img  = img.resize((int(w * scale), int(h * scale)), Image.LANCZOS)
+    img   = preview(path, Image)
     photo = ImageTk.PhotoImage(img)
 
     lbl = tk.Label(root, image=photo, bg="black", bd=2, relief="solid",
@@ -84,6 +91,15 @@ def show_tkinter(path):
 
     root.mainloop()
 
+def preview(path, Image):
+    """Image scaled to fit ~960x600 — untouched when it already fits."""
+    img = Image.open(path)
+    w, h = img.size
+    scale = min(960 / w, 600 / h)
+    if scale >= 1.0:
+        return img
+    return img.resize((int(w * scale), int(h * scale)), Image.BILINEAR)
+
 def popup(path):
     """Try viewers in order of preference."""
     for fn in (show_feh, show_eog, show_display):
@@ -112,7 +128,7 @@ def main():
     ok = grab(path, select=select)
 
     if not ok:
-        print(f"  scrot failed — is DISPLAY set?")
+        print("  capture failed — is DISPLAY set?")
         sys.exit(1)
 
     size = Path(path).stat().st_size // 1024
@@ -11,9 +11,16 @@ Usage:
   sov-see                      # grab full screen + describe
   sov-see "what is open?"      # grab + ask specific question
   sov-see --crop               # click-drag a region first
+  sov-see --near               # also reuse an answer for a near-identical screen
+  sov-see --questions qs.txt   # several questions, one screenshot, in parallel
+  sov-see --batch --questions qs.txt   # same, via Message Batches (half price)
+  sov-see --batch-id ID        # fetch a batch's answers
 """
-import os, sys, base64, subprocess, tempfile, argparse, requests
+import os, sys, io, json, time, base64, hashlib, textwrap, threading, subprocess, tempfile, argparse
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+requests = None   # imported on first use — --help and cache hits never pay for it
 
 # ── CONFIG ─────────────────────────────────────────────────────────────────
 # Uses Anthropic vision API by default (claude-haiku — fast + cheap)
@@ -22,6 +29,11 @@ from pathlib import Path
 VISION_API   = os.environ.get("VISION_API",   "https://api.anthropic.com/v1/messages")
 VISION_MODEL = os.environ.get("VISION_MODEL",  "claude-haiku-4-5-20251001")
 DEFAULT_Q    = "Describe what is on this screen. Be specific and direct."
+MAX_EDGE     = 1568   # the model downsamples past this anyway — don't upload it
+CACHE_DIR    = Path.home() / ".cache" / "sov-see"   # (screen, question) → answer
+CACHE_TTL    = 3600   # seconds an answer is trusted; older entries are pruned
+NEAR_BITS    = 8      # --near: dHash bits two screens may differ by and still share an answer
+PARALLEL     = 10     # --questions fan-out; the connection pool is sized to match
 
 def load_token():
     for src in [
@@ -34,6 +46,27 @@ def load_token():
         except: pass
     return ""
 
+# one pooled connection — repeat calls skip the TCP + TLS handshake
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+def _session():
+    global _SESSION, requests
+    if _SESSION is None:
+        with _SESSION_LOCK:                 # --questions workers may all get here at once
+            if _SESSION is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                s = requests.Session()
+                s.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=PARALLEL))
+                s.headers.update({
+                    "x-api-key":         load_token(),
+                    "anthropic-version": "2023-06-01",
+                    "content-type":      "application/json",
+                })
+                _SESSION = s
+    return _SESSION
+
 # ── ANSI ───────────────────────────────────────────────────────────────────
 CYAN = "\033[38;2;0;220;255m"
 LIME = "\033[38;2;57;255;100m"
@@ -45,26 +78,105 @@ BOLD = "\033[1m"
 
 # ── GRAB ───────────────────────────────────────────────────────────────────
 def grab(select=False):
+    """
+    Screen → (raw bytes, PIL image or None, label). mss reads the pixels
+    straight into memory; scrot writes a PNG only for --crop (interactive
+    select) or when mss/Pillow aren't installed.
+    """
+    env = {**os.environ, "DISPLAY": os.environ.get("DISPLAY", ":0")}
+    if not select:
+        try:
+            import mss
+            from PIL import Image
+            with mss.mss(display=env["DISPLAY"]) as sct:
+                shot = sct.grab(sct.monitors[0])
+            img = Image.frombytes("RGB", shot.size, shot.rgb)
+            return shot.bgra, img, f"{shot.width}×{shot.height}"
+        except ImportError:
+            pass
     path = "/tmp/sov-see.png"
-    env  = {**os.environ, "DISPLAY": os.environ.get("DISPLAY", ":0")}
     cmd  = ["scrot", "-s", path] if select else ["scrot", path]
     r    = subprocess.run(cmd, env=env, capture_output=True)
     if r.returncode != 0:
         print(f"  scrot failed: {r.stderr.decode()}")
         sys.exit(1)
-    return path
+    return Path(path).read_bytes(), None, path
 
-# ── SEE ────────────────────────────────────────────────────────────────────
-def see(image_path, question, token):
-    img_data = base64.standard_b64encode(Path(image_path).read_bytes()).decode()
+def shrink(raw, img=None):
+    """
+    Screenshot → (bytes, media_type, dhash). JPEG at MAX_EDGE if Pillow is
+    around; otherwise the PNG as-is and no perceptual hash.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return raw, "image/png", None
+    if img is None:
+        img = Image.open(io.BytesIO(raw)).convert("RGB")
+    img.thumbnail((MAX_EDGE, MAX_EDGE), Image.LANCZOS)
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=85)
+    return buf.getvalue(), "image/jpeg", dhash(img)
 
-    headers = {
-        "x-api-key":         token,
-        "anthropic-version": "2023-06-01",
-        "content-type":      "application/json",
-    }
+def dhash(img):
+    """256-bit difference hash — a blinking cursor flips a bit or two, not 100."""
+    px = img.convert("L").resize((17, 16)).tobytes()
+    bits = 0
+    for row in range(16):
+        for col in range(16):
+            i = row * 17 + col
+            bits = (bits << 1) | (px[i] > px[i + 1])
+    return bits
+
+# ── CACHE ──────────────────────────────────────────────────────────────────
+# files are {blake2b(screen)}-{blake2b(question)}-{dhash}.txt — the exact key
+# and the perceptual key both live in the name, so lookup is just a glob
+def _h(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _fresh(f, now):
+    return now - f.stat().st_mtime <= CACHE_TTL
+
+def cache_get(key, qkey, phash=None):
+    """
+    Exact screen bytes → answer. With a phash (--near only) a visually
+    near-identical screen counts too — a dHash can't see a changed line of
+    text, so that's opt-in.
+    """
+    now = time.time()
+    try:
+        for f in CACHE_DIR.glob(f"{key}-{qkey}-*.txt"):
+            if _fresh(f, now):
+                return f.read_text()
+        if phash is None:
+            return None
+        for f in CACHE_DIR.glob(f"*-{qkey}-*.txt"):
+            near = f.stem.rsplit("-", 1)[1]
+            if near != "x" and bin(int(near, 16) ^ phash).count("1") <= NEAR_BITS and _fresh(f, now):
+                return f.read_text()
+    except Exception:
+        pass
+    return None
+
+def cache_prune():
+    now = time.time()
+    for f in CACHE_DIR.glob("*.txt"):
+        try:
+            if not _fresh(f, now): f.unlink()
+        except OSError:
+            pass
 
-    payload = {
+def cache_put(key, qkey, phash, text):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cache_prune()
+    path = CACHE_DIR / f"{key}-{qkey}-{'x' if phash is None else f'{phash:064x}'}.txt"
+    tmp  = path.with_suffix(".tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+# ── SEE ────────────────────────────────────────────────────────────────────
+def payload(img_data, media_type, question):
+    return {
         "model": VISION_MODEL,
         "max_tokens": 1024,
         "messages": [{
@@ -74,7 +186,7 @@ def see(image_path, question, token):
                     "type": "image",
                     "source": {
                         "type":       "base64",
-                        "media_type": "image/png",
+                        "media_type": media_type,
                         "data":       img_data,
                     },
                 },
@@ -86,23 +198,109 @@ def see(image_path, question, token):
         }],
     }
 
+def _post(url, body, tries=3):
+    """POST with exponential backoff on connection errors, 429 and 5xx."""
+    for i in range(tries):
+        if i:
+            time.sleep(2 ** (i - 1))
+        try:
+            r = _session().post(url, json=body, timeout=60)
+        except requests.RequestException:
+            if i == tries - 1:
+                raise
+            continue
+        if (r.status_code != 429 and r.status_code < 500) or i == tries - 1:
+            return r
+
+def see(img_data, media_type, question):
+    """One question about one (already base64'd) screenshot → (text, error)."""
+    try:
+        r = _post(VISION_API, payload(img_data, media_type, question))
+    except Exception as e:
+        return None, f"connection error: {e}"
+    if not r.ok:
+        return None, f"API error {r.status_code}: {r.text[:200]}"
+    return r.json()["content"][0]["text"].strip(), None
+
+# ── BATCH ──────────────────────────────────────────────────────────────────
+# Message Batches: half price, answers within 24h. The sidecar remembers which
+# screen and questions a batch was for so results land in the cache too.
+def submit_batch(img_data, media_type, questions, key, phash):
+    reqs = [{"custom_id": f"q{i}", "params": payload(img_data, media_type, q)}
+            for i, q in enumerate(questions)]
     try:
-        r = requests.post(VISION_API, json=payload, headers=headers, timeout=60)
+        r = _post(f"{VISION_API}/batches", {"requests": reqs})
     except Exception as e:
         print(f"  {GRAY}connection error: {e}{RST}")
         sys.exit(1)
+    if not r.ok:
+        print(f"  {GRAY}API error {r.status_code}: {r.text[:200]}{RST}")
+        sys.exit(1)
+    bid = r.json()["id"]
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    (CACHE_DIR / f"{bid}.batch").write_text(json.dumps(
+        {"key": key, "phash": phash, "questions": questions}))
+    return bid
 
+def fetch_batch(bid):
+    """→ {question: answer}, or exits with the batch status if not done yet."""
+    try:
+        r = _session().get(f"{VISION_API}/batches/{bid}", timeout=30)
+        if r.ok:
+            status = r.json()["processing_status"]
+            if status != "ended":
+                print(f"  {GRAY}batch {bid}: {status}{RST}\n")
+                sys.exit(0)
+            r = _session().get(r.json()["results_url"], timeout=60)
+    except requests.RequestException as e:
+        print(f"  {GRAY}connection error: {e}{RST}")
+        sys.exit(1)
     if not r.ok:
         print(f"  {GRAY}API error {r.status_code}: {r.text[:200]}{RST}")
         sys.exit(1)
 
-    return r.json()["content"][0]["text"].strip()
+    try:
+        meta = json.loads((CACHE_DIR / f"{bid}.batch").read_text())
+    except Exception:
+        meta = {"key": None, "phash": None, "questions": []}
+    qs, answers = meta["questions"], {}
+    for line in r.text.splitlines():
+        if not line.strip():
+            continue
+        e   = json.loads(line)
+        res = e["result"]
+        n   = int(e["custom_id"][1:])
+        q   = qs[n] if n < len(qs) else e["custom_id"]
+        if res["type"] == "succeeded":
+            answers[q] = res["message"]["content"][0]["text"].strip()
+            if meta["key"]:
+                try:
+                    cache_put(meta["key"], _h(q.encode())[:16], meta["phash"], answers[q])
+                except OSError:
+                    pass
+        else:
+            answers[q] = f"({res['type']})"
+    return answers
+
+# ── SHOW ───────────────────────────────────────────────────────────────────
+_WRAP = textwrap.TextWrapper(width=74, initial_indent="  ", subsequent_indent="  ")
+
+def show(title, text):
+    print(f"{PINK}{BOLD}  ◉ {title}{RST}\n")
+    # word-wrap at 72
+    print("\n".join(_WRAP.fill(para) for para in text.split("\n")))
+    print()
 
 # ── MAIN ───────────────────────────────────────────────────────────────────
 def main():
     parser = argparse.ArgumentParser(description="sov-see — it can SEE")
     parser.add_argument("question", nargs="?", default=DEFAULT_Q)
     parser.add_argument("--crop",   action="store_true", help="click-drag region")
+    parser.add_argument("--no-cache", action="store_true", help="always ask the model")
+    parser.add_argument("--near",   action="store_true", help="reuse answers for a near-identical screen")
+    parser.add_argument("--questions", metavar="FILE", help="one question per line, asked in parallel")
+    parser.add_argument("--batch",  action="store_true", help="submit as a Message Batch (half price, async)")
+    parser.add_argument("--batch-id", metavar="ID", help="fetch the answers of a submitted batch")
     args = parser.parse_args()
 
     token = load_token()
@@ -110,31 +308,72 @@ def main():
         print(f"  {GRAY}no token — set ANTHROPIC_API_KEY or write ~/.anthropic-token{RST}")
         sys.exit(1)
 
+    if args.batch_id:
+        print(f"\n{CYAN}{BOLD}  sov-see{RST}  {GRAY}fetching batch {args.batch_id}...{RST}\n", flush=True)
+        for q, text in fetch_batch(args.batch_id).items():
+            show(q, text)
+        return
+
+    questions = [args.question]
+    if args.questions:
+        questions = [q.strip() for q in Path(args.questions).read_text().splitlines() if q.strip()]
+    title = (lambda q: "what it sees:") if len(questions) == 1 else (lambda q: q)
+
     print(f"\n{CYAN}{BOLD}  sov-see{RST}  {GRAY}grabbing screen...{RST}", flush=True)
-    path = grab(select=args.crop)
-    size = Path(path).stat().st_size // 1024
-    print(f"  {LIME}✓{RST}  {path}  {GRAY}({size}K){RST}")
+    raw, img, label = grab(select=args.crop)
+    key   = _h(raw)
+    qkeys = {q: _h(q.encode())[:16] for q in questions}
+    use_cache = not args.no_cache and not args.batch
 
-    print(f"  {GRAY}sending to vision model...{RST}\n", flush=True)
+    answers = {}
+    if use_cache:
+        for q in questions:
+            hit = cache_get(key, qkeys[q])
+            if hit is not None:
+                answers[q] = hit
+    todo = [q for q in questions if q not in answers]
 
-    response = see(path, args.question, token)
+    if not todo:
+        print(f"  {LIME}✓{RST}  {label}  {GRAY}(cached — screen unchanged){RST}\n")
+    else:
+        image, media_type, phash = shrink(raw, img)
+        print(f"  {LIME}✓{RST}  {label}  {GRAY}({len(image) // 1024}K {media_type[6:]}){RST}")
+        if use_cache and args.near:
+            for q in todo:
+                hit = cache_get(key, qkeys[q], phash)
+                if hit is not None:
+                    answers[q] = hit
+            if len(answers) == len(questions):
+                print(f"  {GRAY}(cached — near-identical screen){RST}\n")
+            todo = [q for q in todo if q not in answers]
 
-    print(f"{PINK}{BOLD}  ◉ what it sees:{RST}\n")
-    # word-wrap at 72
-    for para in response.split("\n"):
-        words, line = para.split(), ""
-        for w in words:
-            if len(line) + len(w) + 1 > 72:
-                print(f"  {line}")
-                line = w
+    if todo:
+        img_data = base64.standard_b64encode(image).decode()   # shared by every request
+
+        if args.batch:
+            bid = submit_batch(img_data, media_type, todo, key, phash)
+            print(f"  {LIME}✓{RST}  batch {bid}  {GRAY}— fetch with: sov-see --batch-id {bid}{RST}\n")
+            return
+
+        print(f"  {GRAY}sending to vision model...{RST}\n", flush=True)
+        _session()                          # build it once, before the fan-out
+        with ThreadPoolExecutor(max_workers=min(PARALLEL, len(todo))) as pool:
+            results = list(pool.map(lambda q: see(img_data, media_type, q), todo))
+        for q, (text, err) in zip(todo, results):
+            if err:
+                if len(questions) == 1:
+                    print(f"  {GRAY}{err}{RST}")
+                    sys.exit(1)
+                text = err
             else:
-                line = (line + " " + w).strip()
-        if line:
-            print(f"  {line}")
-        else:
-            print()
+                try:
+                    cache_put(key, qkeys[q], phash, text)
+                except OSError:
+                    pass
+            answers[q] = text
 
-    print()
+    for q in questions:
+        show(title(q), answers[q])
 
 if __name__ == "__main__":
     main()
@@ -11,16 +11,23 @@ Usage:
   python3 sov-voice.py           # auto-detects silence, types result
   python3 sov-voice.py --push    # push-to-talk: hold Enter, release to transcribe
   python3 sov-voice.py --model base  # slightly more accurate, still fast
+  python3 sov-voice.py --daemon  # keep the model loaded; later runs skip the load
 """
-import sys, os, time, subprocess, argparse, threading, queue
-import numpy as np
-import sounddevice as sd
-from faster_whisper import WhisperModel
+import sys, os, glob, json, time, queue, base64, socket, struct, subprocess, argparse, threading
+from concurrent.futures import ThreadPoolExecutor
+
+# heavy imports happen in main() — --help and arg errors stay instant
+np = sd = None
+try:
+    import webrtcvad                 # tiny C VAD — crops clips before whisper sees them
+except ImportError:
+    webrtcvad = None
 
 # ── CONFIG ────────────────────────────────────────────────────────────────────
 SAMPLE_RATE   = 16000
 CHANNELS      = 1
-CHUNK         = 512          # samples per callback
+CHUNK         = 512          # samples per VAD decision
+BLOCK         = 2048         # samples per callback — 4 decisions per wakeup
 SILENCE_DB    = -35          # dB threshold — below this = silence
 SILENCE_SEC   = 1.2          # seconds of silence before transcribing
 MIN_SPEECH    = 0.4          # ignore clips shorter than this (accidental noise)
@@ -36,10 +43,77 @@ RED  = "\033[38;2;255;70;70m"
 RST  = "\033[0m"
 BOLD = "\033[1m"
 
-def rms_db(chunk):
-    """RMS amplitude in dB."""
-    rms = np.sqrt(np.mean(chunk.astype(np.float32) ** 2) + 1e-10)
-    return 20 * np.log10(rms / 32768)
+# the dB threshold as a sum of squares over one CHUNK of int16 — compare
+# energies directly, no sqrt/log10 per callback
+SILENCE_SUMSQ = (10 ** (SILENCE_DB / 20) * 32768) ** 2 * CHUNK
+
+_sumsq_i16 = None
+
+def _init_kernel():
+    """Build the energy kernel once numpy is loaded — numba if it's installed."""
+    global _sumsq_i16
+    try:
+        from numba import njit
+    except ImportError:
+        def _sumsq_i16(buf, n):
+            f = buf.astype(np.float32).reshape(-1, n)
+            return np.einsum("ij,ij->i", f, f)
+        return
+
+    # one tight loop straight over the int16 buffer — no float32 copy per callback
+    @njit(cache=True)
+    def _sumsq_i16(buf, n):
+        out = np.empty(buf.size // n, np.int64)
+        for j in range(out.size):
+            s = 0
+            for i in range(j * n, (j + 1) * n):
+                v = np.int64(buf[i])
+                s += v * v
+            out[j] = s
+        return out
+
+def loud(block):
+    """Per-CHUNK speech flags for a block of samples — one kernel call for all."""
+    return _sumsq_i16(block.reshape(-1), CHUNK) > SILENCE_SUMSQ
+
+_XD = False          # False = not tried yet, None = unavailable
+
+def _xdisplay():
+    global _XD
+    if _XD is False:
+        try:
+            from Xlib import display
+            _XD = display.Display(os.environ.get("DISPLAY", ":0"))
+            if not _XD.has_extension("XTEST"): _XD = None
+        except Exception:
+            _XD = None
+    return _XD
+
+def _xtype(text):
+    """
+    Type via XTEST over one long-lived display connection — no fork/exec per
+    utterance. False (nothing typed) if XTEST is missing or a character has
+    no key in the current layout; xdotool handles those.
+    """
+    d = _xdisplay()
+    if d is None: return False
+    from Xlib import X, XK
+    from Xlib.ext import xtest
+    keys = []
+    for ch in text:
+        o   = ord(ch)
+        sym = XK.XK_Return if ch == "\n" else o if o < 0x100 else 0x01000000 + o
+        codes = [(i, kc) for kc, i in d.keysym_to_keycodes(sym) if i < 2]
+        if not codes: return False
+        keys.append(min(codes))           # prefer the unshifted key
+    shift = d.keysym_to_keycode(XK.XK_Shift_L)
+    for level, kc in keys:
+        if level: xtest.fake_input(d, X.KeyPress, shift)
+        xtest.fake_input(d, X.KeyPress, kc)
+        xtest.fake_input(d, X.KeyRelease, kc)
+        if level: xtest.fake_input(d, X.KeyRelease, shift)
+    d.sync()
+    return True
 
 def type_text(text):
     """Type text at current cursor position system-wide."""
@@ -47,6 +121,8 @@ def type_text(text):
     text = text.strip()
     if not text:
         return
+    if _xtype(text):
+        return
     try:
         # xdotool types at wherever the cursor currently is
         subprocess.run(
@@ -58,83 +134,222 @@ def type_text(text):
         # fallback: print it so you can at least copy it
         print(f"\n{GOLD}  [{text}]{RST}\n")
 
+def prefetch(size):
+    """
+    posix_fadvise(WILLNEED) on the cached CT2 weights — the kernel pulls them
+    into page cache while faster-whisper is still importing. No-op off Linux
+    or before the first download.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    hub = os.environ.get("HF_HUB_CACHE") or os.path.join(
+        os.environ.get("HF_HOME", os.path.expanduser("~/.cache/huggingface")), "hub")
+    for f in glob.glob(f"{hub}/models--Systran--faster-whisper-{size}/snapshots/*/*"):
+        try:
+            fd = os.open(f, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
 def load_model(size):
-    print(f"  {GRAY}loading whisper {size} model...{RST}", end="", flush=True)
-    model = WhisperModel(size, device="cpu", compute_type="int8")
-    print(f"  {LIME}ready{RST}")
+    from faster_whisper import WhisperModel
+    kw = dict(device="cpu", compute_type="int8",
+              cpu_threads=os.cpu_count() or 0, num_workers=1)
+    try:
+        model = WhisperModel(size, local_files_only=True, **kw)   # no hub round trip
+    except Exception:
+        model = WhisperModel(size, **kw)                          # first run: download
     return model
 
+VAD_FRAME = SAMPLE_RATE * 30 // 1000    # webrtcvad takes 10/20/30 ms frames
+VAD_PAD   = 10                          # frames (300 ms) kept either side of speech
+
+def trim(audio_np):
+    """
+    Crop to [first voiced frame, last voiced frame] + padding with webrtcvad.
+    None when webrtcvad isn't installed — whisper's own VAD does the job then.
+    """
+    if webrtcvad is None:
+        return None
+    vad = webrtcvad.Vad(2)
+    pcm = (audio_np * 32767).astype(np.int16).tobytes()
+    step = VAD_FRAME * 2
+    voiced = [i for i in range(len(pcm) // step)
+              if vad.is_speech(pcm[i * step:(i + 1) * step], SAMPLE_RATE)]
+    if not voiced:
+        return audio_np[:0]
+    start = max(0, voiced[0] - VAD_PAD) * VAD_FRAME
+    end   = (voiced[-1] + 1 + VAD_PAD) * VAD_FRAME
+    return audio_np[start:end]
+
 def transcribe(model, audio_np):
+    if isinstance(model, DaemonClient):
+        return model.transcribe(audio_np)
+    trimmed = trim(audio_np)
+    if trimmed is not None:
+        if len(trimmed) < MIN_SPEECH * SAMPLE_RATE:
+            return ""
+        audio_np = trimmed
     segments, _ = model.transcribe(
         audio_np,
         language="en",
-        vad_filter=True,
+        vad_filter=trimmed is None,     # already cropped — skip the Silero pass
         vad_parameters={"min_silence_duration_ms": 300},
         beam_size=1,          # fastest
         best_of=1,
     )
     return " ".join(s.text for s in segments).strip()
 
+# one worker: CT2 drops the GIL so the audio loop keeps running, and a single
+# lane keeps utterances typed in the order they were spoken
+_POOL = ThreadPoolExecutor(max_workers=1)
+
+# typing gets its own lane too — a long sentence never holds up the next transcribe
+_TYPE_Q = queue.SimpleQueue()
+
+def _typist():
+    while True:
+        type_text(_TYPE_Q.get())
+
+# the terminal belongs to the main thread — workers hand it lines through here
+_SAY_Q = queue.SimpleQueue()
+
+def _job(model, audio_np, width):
+    try:
+        text = transcribe(model, audio_np)
+    except Exception as e:
+        _SAY_Q.put(f"  {RED}transcribe failed: {e}{RST}")
+        return
+    if text:
+        _TYPE_Q.put(text)
+        _SAY_Q.put(f"  {LIME}✓ {text[:width]}{RST}")
+    else:
+        _SAY_Q.put(f"  {GRAY}(nothing heard){RST}")
+
+def transcribe_bg(model, audio_np, width):
+    """Transcribe off the audio loop; the text is typed, its line queued for say()."""
+    return _POOL.submit(_job, model, audio_np, width)
+
+def say(status=""):
+    """Main thread: print finished transcripts over the status line, then repaint it."""
+    out = []
+    while True:
+        try:    out.append(f"\r\033[2K{_SAY_Q.get_nowait()}\n")
+        except queue.Empty: break
+    if out:
+        sys.stdout.write("".join(out) + status)
+        sys.stdout.flush()
+    return bool(out)
+
+# ── RING BUFFER ───────────────────────────────────────────────────────────────
+class Ring:
+    """
+    Preallocated int16 ring: the audio callback writes, the main loop reads.
+    Single producer, single consumer — the counters only ever grow, so no
+    lock and no Queue. Reads are zero-copy views.
+    """
+    def __init__(self, seconds=30):
+        self.size = SAMPLE_RATE * seconds // BLOCK * BLOCK   # BLOCK reads never wrap
+        self.buf  = np.empty(self.size, np.int16)
+        self.w    = 0        # samples written (callback thread)
+        self.r    = 0        # samples consumed (main thread)
+
+    def write(self, data):
+        n = len(data)
+        i = self.w % self.size
+        k = min(n, self.size - i)
+        self.buf[i:i + k] = data[:k]
+        if k < n:
+            self.buf[:n - k] = data[k:]
+        self.w += n
+
+    def read(self, n):
+        """Next n unread samples as a view, or None if they haven't arrived yet."""
+        if self.w - self.r < n:
+            return None
+        if self.w - self.r > self.size:      # lapped — drop what was overwritten
+            self.r = self.w - self.size
+        i = self.r % self.size
+        self.r += n
+        return self.buf[i:i + n]
+
+    def to_float(self, start, end):
+        """
+        Samples [start, end) as float32 in [-1, 1). Scaled straight out of the
+        ring into one fresh array — no concat, no flatten, no extra cast copy.
+        """
+        n   = end - start
+        i   = start % self.size
+        k   = min(n, self.size - i)
+        out = np.empty(n, np.float32)
+        np.multiply(self.buf[i:i + k], np.float32(1 / 32768), out=out[:k])
+        if k < n:
+            np.multiply(self.buf[:n - k], np.float32(1 / 32768), out=out[k:])
+        return out
+
+MAX_SEGMENT = 28 * SAMPLE_RATE     # transcribe before an utterance outgrows the ring
+
 # ── VAD MODE (auto — default) ─────────────────────────────────────────────────
 def run_vad(model):
     print(f"\n{PINK}{BOLD}  sov-voice{RST}  {GRAY}listening — speak naturally, pause to transcribe{RST}")
     print(f"  {GRAY}Ctrl+C to quit{RST}\n")
 
-    audio_buffer = []
-    silence_start = None
-    recording = False
-    q = queue.Queue()
+    ring          = Ring()
+    seg_start     = 0          # ring index where the current utterance began
+    silence_start = None       # ring index where the current silence began
+    recording     = False
+    REC, LISTEN   = f"  {RED}● recording{RST}   ", f"  {GRAY}listening...{RST}   "
 
     def callback(indata, frames, time_info, status):
-        q.put(indata.copy())
+        ring.write(indata[:, 0])
 
     with sd.InputStream(samplerate=SAMPLE_RATE, channels=CHANNELS,
-                        dtype='int16', blocksize=CHUNK, callback=callback):
+                        dtype='int16', blocksize=BLOCK, callback=callback):
         try:
             while True:
-                chunk = q.get()
-                db = rms_db(chunk)
-                is_speech = db > SILENCE_DB
-
-                if is_speech:
-                    if not recording:
-                        recording = True
-                        audio_buffer = []
-                        sys.stdout.write(f"\r  {RED}● recording{RST}   ")
-                        sys.stdout.flush()
-                    silence_start = None
-                    audio_buffer.append(chunk)
-
-                elif recording:
-                    audio_buffer.append(chunk)
-                    if silence_start is None:
-                        silence_start = time.time()
-                    elif time.time() - silence_start >= SILENCE_SEC:
+                say(REC if recording else LISTEN)
+                block = ring.read(BLOCK)
+                if block is None:
+                    time.sleep(BLOCK / SAMPLE_RATE / 2)
+                    continue
+
+                pos = ring.r - BLOCK
+                for is_speech in loud(block):
+                    pos += CHUNK           # ring index just past this CHUNK
+
+                    if is_speech:
+                        if not recording:
+                            recording = True
+                            seg_start = pos - CHUNK
+                            sys.stdout.write(f"\r{REC}")
+                            sys.stdout.flush()
+                        silence_start = None
+
+                    elif recording and silence_start is None:
+                        silence_start = pos - CHUNK
+
+                    if recording and (
+                            (silence_start is not None
+                             and pos - silence_start >= SILENCE_SEC * SAMPLE_RATE)
+                            or pos - seg_start >= MAX_SEGMENT):
                         # silence detected — transcribe
                         recording = False
-                        audio_np = np.concatenate(audio_buffer).flatten().astype(np.float32) / 32768.0
+                        audio_np = ring.to_float(seg_start, pos)
                         duration = len(audio_np) / SAMPLE_RATE
 
+                        silence_start = None
                         if duration >= MIN_SPEECH:
+                            # keep listening while it thinks — the next sentence can start now
                             sys.stdout.write(f"\r  {CYAN}◎ thinking...{RST}   ")
                             sys.stdout.flush()
-                            text = transcribe(model, audio_np)
-                            if text:
-                                sys.stdout.write(f"\r  {LIME}✓ {text[:60]}{RST}\n")
-                                sys.stdout.flush()
-                                type_text(text)
-                            else:
-                                sys.stdout.write(f"\r  {GRAY}(nothing){RST}\n")
-                                sys.stdout.flush()
+                            transcribe_bg(model, audio_np, 60)
                         else:
-                            sys.stdout.write(f"\r  {GRAY}(too short){RST}\n")
+                            sys.stdout.write(f"\r  {GRAY}(too short){RST}\n{LISTEN}")
                             sys.stdout.flush()
 
-                        audio_buffer = []
-                        silence_start = None
-                        sys.stdout.write(f"  {GRAY}listening...{RST}   ")
-                        sys.stdout.flush()
-
         except KeyboardInterrupt:
             print(f"\n\n{GRAY}  ✦  sov-voice out{RST}\n")
 
@@ -143,63 +358,182 @@ def run_push(model):
     print(f"\n{PINK}{BOLD}  sov-voice{RST}  {GRAY}push-to-talk mode{RST}")
     print(f"  {GRAY}press Enter to record → Enter again to transcribe → Ctrl+C to quit{RST}\n")
 
+    ring    = Ring()
+    enabled = threading.Event()      # gates the callback; the device stays open
+
+    def callback(indata, frames, time_info, status):
+        if enabled.is_set():
+            ring.write(indata[:, 0])
+
+    stream = sd.InputStream(samplerate=SAMPLE_RATE, channels=CHANNELS,
+                            dtype='int16', blocksize=BLOCK, callback=callback)
+    stream.start()
+    pending = None
     try:
         while True:
+            # input() owns the line while it waits — print the last result first
+            if pending: pending.result()
+            say()
             input(f"  {GOLD}[ hold Enter to record ]{RST} ")
-            audio_buffer = []
-            q = queue.Queue()
-            stop_flag = threading.Event()
-
-            def callback(indata, frames, time_info, status):
-                if not stop_flag.is_set():
-                    q.put(indata.copy())
+            start = ring.w
+            enabled.set()
 
             sys.stdout.write(f"\r  {RED}● recording — Enter to stop{RST}   ")
             sys.stdout.flush()
 
-            with sd.InputStream(samplerate=SAMPLE_RATE, channels=CHANNELS,
-                                dtype='int16', blocksize=CHUNK, callback=callback):
-                input()   # wait for Enter
-                stop_flag.set()
+            input()   # wait for Enter
+            enabled.clear()
 
-            # drain queue
-            while not q.empty():
-                audio_buffer.append(q.get())
-
-            if not audio_buffer:
+            if ring.w == start:
                 continue
 
-            audio_np = np.concatenate(audio_buffer).flatten().astype(np.float32) / 32768.0
+            audio_np = ring.to_float(max(start, ring.w - MAX_SEGMENT), ring.w)
             duration = len(audio_np) / SAMPLE_RATE
 
             if duration < MIN_SPEECH:
                 print(f"  {GRAY}(too short){RST}")
                 continue
 
-            sys.stdout.write(f"\r  {CYAN}◎ transcribing ({duration:.1f}s)...{RST}   ")
-            sys.stdout.flush()
-
-            text = transcribe(model, audio_np)
-            if text:
-                print(f"\r  {LIME}✓ {text[:80]}{RST}   ")
-                type_text(text)
-            else:
-                print(f"\r  {GRAY}(nothing heard){RST}   ")
+            print(f"\r  {CYAN}◎ transcribing ({duration:.1f}s)...{RST}   ")
+            pending = transcribe_bg(model, audio_np, 80)
 
     except KeyboardInterrupt:
         print(f"\n\n{GRAY}  ✦  sov-voice out{RST}\n")
+    finally:
+        stream.close()
+
+# ── DAEMON ────────────────────────────────────────────────────────────────────
+# `--daemon` loads the model once and serves it on a unix socket; every later
+# run finds the socket and skips faster-whisper entirely. One JSON line each way:
+#   → {"audio_b64": <float32 samples>, "sr": 16000}    ← {"text": ...}
+_RUN  = f"/run/user/{os.getuid()}"
+SOCK  = f"{_RUN}/sov-voice.sock" if os.path.isdir(_RUN) else f"/tmp/sov-voice-{os.getuid()}.sock"
+
+def _peer_is_me(s):
+    """
+    The /tmp fallback path is predictable — another user could bind it first,
+    swallow the audio and answer with text that gets typed. Only talk to
+    sockets whose other end runs as us.
+    """
+    try:
+        _, uid, _ = struct.unpack("3i", s.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                                                     struct.calcsize("3i")))
+    except (AttributeError, OSError):
+        try:    uid = os.stat(SOCK).st_uid        # no SO_PEERCRED — fall back to the file owner
+        except OSError: return False
+    return uid == os.getuid()
+
+class DaemonClient:
+    """Stands in for the model when a daemon is listening."""
+    def __init__(self, sock):
+        self.sock = sock
+        self.f    = sock.makefile("rwb")
+        self.lock = threading.Lock()
+
+    @classmethod
+    def connect(cls):
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            s.connect(SOCK)
+        except OSError:
+            s.close()
+            return None
+        if not _peer_is_me(s):
+            print(f"{RED}  ✗  {SOCK} belongs to another user — ignoring it{RST}", file=sys.stderr)
+            s.close()
+            return None
+        return cls(s)
+
+    def transcribe(self, audio_np):
+        msg = json.dumps({"audio_b64": base64.b64encode(audio_np.astype(np.float32, copy=False)).decode(),
+                          "sr": SAMPLE_RATE})
+        with self.lock:
+            self.f.write(msg.encode() + b"\n")
+            self.f.flush()
+            line = self.f.readline()
+        if not line:
+            raise RuntimeError("daemon went away")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply["text"]
+
+def serve(model):
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            if not _peer_is_me(self.connection): return
+            for line in self.rfile:
+                try:
+                    req = json.loads(line)
+                    if req.get("sr", SAMPLE_RATE) != SAMPLE_RATE:
+                        raise ValueError(f"sample rate must be {SAMPLE_RATE}")
+                    audio = np.frombuffer(base64.b64decode(req["audio_b64"]), np.float32)
+                    reply = {"text": transcribe(model, audio)}
+                except Exception as e:
+                    reply = {"error": str(e)}
+                self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+    try:
+        os.unlink(SOCK)             # stale socket from a daemon that died
+    except FileNotFoundError:
+        pass
+    except PermissionError:         # someone else's socket squatting on our path
+        sys.exit(f"{RED}  ✗  {SOCK} is owned by another user — refusing to serve on it{RST}")
+    with socketserver.ThreadingUnixStreamServer(SOCK, Handler) as srv:
+        os.chmod(SOCK, 0o600)
+        srv.daemon_threads = True
+        print(f"\n{PINK}{BOLD}  sov-voice{RST}  {GRAY}daemon on {SOCK} — Ctrl+C to quit{RST}\n")
+        try:
+            srv.serve_forever()
+        except KeyboardInterrupt:
+            print(f"\n{GRAY}  ✦  sov-voice daemon out{RST}\n")
+        finally:
+            os.unlink(SOCK)
 
 # ── MAIN ──────────────────────────────────────────────────────────────────────
 def main():
     parser = argparse.ArgumentParser(description="sov-voice — sovereign STT")
     parser.add_argument("--push",  action="store_true", help="push-to-talk mode")
     parser.add_argument("--model", default=MODEL_SIZE,  help="whisper model size (tiny/base/small)")
+    parser.add_argument("--daemon", action="store_true", help="keep the model loaded and serve other runs")
     args = parser.parse_args()
 
+    global np, sd
+    import numpy as np
+
+    client = DaemonClient.connect()
+    if client and args.daemon:
+        print(f"  {GRAY}a daemon is already listening on {SOCK}{RST}")
+        sys.exit(1)
+    if not client:
+        # load in the background — the banner, sounddevice and the VAD kernel
+        # all get set up while faster-whisper imports and the weights page in
+        prefetch(args.model)
+        loading = ThreadPoolExecutor(max_workers=1).submit(load_model, args.model)
+
     print(f"\n{PINK}{BOLD}  sov-voice  ·  sovereign STT{RST}")
-    print(f"  {GRAY}model:{RST} {LIME}{args.model}{RST}   {GRAY}device: cpu  ·  local  ·  zero cloud{RST}\n")
+    if client:
+        print(f"  {GRAY}model:{RST} {LIME}daemon{RST}   {GRAY}{SOCK}  ·  local  ·  zero cloud{RST}\n")
+        model = client
+    else:
+        print(f"  {GRAY}model:{RST} {LIME}{args.model}{RST}   {GRAY}device: cpu  ·  local  ·  zero cloud{RST}\n")
 
-    model = load_model(args.model)
+    if not args.daemon:
+        import sounddevice as sd
+        _init_kernel()
+        threading.Thread(target=_typist, daemon=True).start()
+        loud(np.zeros(BLOCK, np.int16))     # compile the VAD kernel now, not on the first callback
+
+    if not client:
+        print(f"  {GRAY}loading whisper {args.model} model...{RST}", end="", flush=True)
+        model = loading.result()
+        print(f"  {LIME}ready{RST}")
+
+    if args.daemon:
+        serve(model)
+        return
 
     if args.push:
         run_push(model)
@@ -0,0 +1,48 @@
+import importlib.util, json, os, unittest
+from unittest import mock
+
+_spec = importlib.util.spec_from_file_location(
+    "sovereign", os.path.join(os.path.dirname(__file__), "..", "sovereign.py"))
+sovereign = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(sovereign)
+
+
+class _Raw:
+    def __init__(self, body): self.body = body
+    def stream(self, n, decode_content=True):
+        for i in range(0, len(self.body), n):
+            yield self.body[i:i + n]
+
+class _Resp:
+    ok = True
+    def __init__(self, events):
+        self.raw = _Raw(b"".join(b"data: " + json.dumps(e).encode() + b"\n\n" for e in events)
+                        + b"data: [DONE]\n\n")
+
+def _call(events, on_tool=None):
+    with mock.patch.object(sovereign._SESSION, "post", lambda *a, **k: _Resp(events)):
+        return sovereign.call_model([{"role": "user", "content": "hi"}],
+                                    sovereign.tools_json({}), "t", on_tool)
+
+
+class CallModelFinish(unittest.TestCase):
+    def test_tool_calls_without_finish_reason(self):
+        started = []
+        msg, finish = _call([
+            {"choices": [{"delta": {"tool_calls": [{"index": 0, "id": "a",
+                          "function": {"name": "exec", "arguments": "{\"command\":"}}]}}]},
+            {"choices": [{"delta": {"tool_calls": [{"index": 0,
+                          "function": {"arguments": " \"ls\"}"}}]}}]},
+        ], lambda i, tc: started.append(i))
+        self.assertEqual(finish, "tool_calls")
+        self.assertEqual(started, [0])
+        self.assertEqual(msg["tool_calls"][0]["function"]["arguments"], "{\"command\": \"ls\"}")
+
+    def test_plain_reply_without_finish_reason_is_stop(self):
+        msg, finish = _call([{"choices": [{"delta": {"content": "hello"}}]}])
+        self.assertEqual(finish, "stop")
+        self.assertEqual(msg["content"], "hello")
+
+
+if __name__ == "__main__":
+    unittest.main()